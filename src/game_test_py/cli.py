@@ -11,16 +11,19 @@ def main() -> None:
     sub = parser.add_subparsers(dest="cmd", required=True)
 
     p_rec = sub.add_parser("record", help="Record actions until ESC is released")
-    p_rec.add_argument("output", type=Path, help="Path to save the recording JSON")
+    p_rec.add_argument("output", type=Path, help="Path to save the recording (.json, .jsonl or .msgpack)")
+    p_rec.add_argument(
+        "--pretty", action="store_true", help="Indent .json output for reading by hand"
+    )
 
-    p_rep = sub.add_parser("replay", help="Replay actions from a JSON file")
-    p_rep.add_argument("input", type=Path, help="Path of the recording JSON to replay")
+    p_rep = sub.add_parser("replay", help="Replay actions from a recording file")
+    p_rep.add_argument("input", type=Path, help="Path of the recording (.json, .jsonl or .msgpack) to replay")
 
     args = parser.parse_args()
 
     if args.cmd == "record":
         print("Recording... Press and release ESC to stop.")
-        ActionRecorder().record(args.output)
+        ActionRecorder().record(args.output, pretty=args.pretty)
         print(f"Saved recording to {args.output}")
         return
 
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import contextlib
 import json
+import os
 import sys
 import threading
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, List, Optional
 
 from PySide6 import QtCore, QtGui, QtWidgets
 import ctypes
@@ -23,7 +25,10 @@ except Exception:  # pragma: no cover
     win32process = None  # type: ignore
     win32api = None  # type: ignore
 
-from game_test_py.tools.recorder import ActionRecorder
+from game_test_py.tools.recorder import ActionRecorder, save_recording
+
+RECORDING_SUFFIXES = (".json", ".jsonl", ".msgpack")
+RECORDING_FILTER = "JSON (*.json);;JSON Lines (*.jsonl);;MessagePack (*.msgpack)"
 
 
 @dataclass
@@ -36,9 +41,16 @@ def enumerate_windows() -> List[WindowInfo]:
     windows: List[WindowInfo] = []
     if win32gui is None:
         return windows
+    try:
+        text_length = ctypes.windll.user32.GetWindowTextLengthW  # type: ignore[attr-defined]
+    except Exception:
+        text_length = None
 
     def _enum_handler(hwnd: int, _):
         if win32gui.IsWindowVisible(hwnd):
+            # 无标题窗口直接跳过，避免读取文本
+            if text_length is not None and text_length(hwnd) == 0:
+                return
             title = win32gui.GetWindowText(hwnd)
             if title:
                 windows.append(WindowInfo(hwnd=hwnd, title=title))
@@ -47,6 +59,57 @@ def enumerate_windows() -> List[WindowInfo]:
     return windows
 
 
+class _WindowMoveHook:
+    """Out-of-context WinEvent hook reporting location changes of a single window."""
+
+    EVENT_OBJECT_LOCATIONCHANGE = 0x800B
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    OBJID_WINDOW = 0
+
+    def __init__(self, hwnd: int, on_moved: Callable[[], None]) -> None:
+        self._hook = None
+        self._proc = None
+        if win32process is None:
+            return
+        from ctypes import wintypes
+
+        user32 = ctypes.windll.user32  # type: ignore[attr-defined]
+        proc_type = ctypes.WINFUNCTYPE(  # type: ignore[attr-defined]
+            None,
+            wintypes.HANDLE,
+            wintypes.DWORD,
+            wintypes.HWND,
+            wintypes.LONG,
+            wintypes.LONG,
+            wintypes.DWORD,
+            wintypes.DWORD,
+        )
+
+        def _callback(_hook, _event, ev_hwnd, id_object, _id_child, _thread, _time) -> None:
+            if id_object == self.OBJID_WINDOW and ev_hwnd == hwnd:
+                on_moved()
+
+        tid, pid = win32process.GetWindowThreadProcessId(hwnd)
+        # 回调对象需保持引用，否则会被回收
+        self._proc = proc_type(_callback)
+        user32.SetWinEventHook.restype = wintypes.HANDLE
+        self._hook = user32.SetWinEventHook(
+            self.EVENT_OBJECT_LOCATIONCHANGE,
+            self.EVENT_OBJECT_LOCATIONCHANGE,
+            None,
+            self._proc,
+            pid,
+            tid,
+            self.WINEVENT_OUTOFCONTEXT,
+        )
+
+    def unhook(self) -> None:
+        if self._hook:
+            ctypes.windll.user32.UnhookWinEvent(ctypes.c_void_p(self._hook))  # type: ignore[attr-defined]
+        self._hook = None
+        self._proc = None
+
+
 class BorderOverlay(QtWidgets.QWidget):
     """Single transparent overlay that draws a red rectangle (no fill)."""
 
@@ -56,19 +119,20 @@ class BorderOverlay(QtWidgets.QWidget):
         self.setAttribute(QtCore.Qt.WA_TransparentForMouseEvents, True)
         self.setWindowFlag(QtCore.Qt.WindowStaysOnTopHint, True)
         self.setWindowFlag(QtCore.Qt.WindowDoesNotAcceptFocus, True)
+        # 只画边框，无需擦除背景
+        self.setAttribute(QtCore.Qt.WA_NoSystemBackground, True)
         self._color = QtGui.QColor(color)
         self._width = width
+        self._pen = QtGui.QPen(self._color)
+        self._pen.setWidth(self._width)
+        self._pen.setCosmetic(True)  # keep width independent of scaling
 
     def paintEvent(self, event: QtGui.QPaintEvent) -> None:  # type: ignore[override]
+        # axis-aligned integer rect: antialiasing would add nothing visible
         painter = QtGui.QPainter(self)
-        painter.setRenderHint(QtGui.QPainter.Antialiasing, True)
-        pen = QtGui.QPen(self._color)
-        pen.setWidth(self._width)
-        pen.setCosmetic(True)  # keep width independent of scaling
-        painter.setPen(pen)
+        painter.setPen(self._pen)
         painter.setBrush(QtCore.Qt.NoBrush)
-        r = self.rect().adjusted(1, 1, -1, -1)
-        painter.drawRect(r)
+        painter.drawRect(self.rect().adjusted(1, 1, -2, -2))
 
     # helper to mirror previous API used by caller
     def set_geometry(self, x: int, y: int, w: int, h: int) -> None:
@@ -90,8 +154,37 @@ class StopPanel(QtWidgets.QWidget):
         layout.addWidget(btn)
 
 
+class _SaveTask(QtCore.QRunnable):
+    """Write a recording on the global thread pool and report back to the window."""
+
+    def __init__(
+        self, receiver: QtCore.QObject, payload: list, fn: str, pretty: bool = False
+    ) -> None:
+        super().__init__()
+        self._receiver = receiver
+        self._payload = payload
+        self._fn = fn
+        self._pretty = pretty
+
+    def run(self) -> None:
+        try:
+            save_recording(self._payload, Path(self._fn), pretty=self._pretty)
+        except Exception as e:
+            QtCore.QMetaObject.invokeMethod(
+                self._receiver,
+                "_save_failed",
+                QtCore.Qt.QueuedConnection,
+                QtCore.Q_ARG(str, str(e)),
+            )
+            return
+        QtCore.QMetaObject.invokeMethod(
+            self._receiver, "_save_done", QtCore.Qt.QueuedConnection, QtCore.Q_ARG(str, self._fn)
+        )
+
+
 class MainWindow(QtWidgets.QWidget):
     save_payload = QtCore.Signal(object)
+    target_moved = QtCore.Signal()
     def __init__(self) -> None:
         super().__init__()
         self.setWindowTitle("操作录制器")
@@ -102,16 +195,22 @@ class MainWindow(QtWidgets.QWidget):
         self._recording: bool = False
         self._overlay: Optional[BorderOverlay] = None
         self._stop_panel: Optional[StopPanel] = None
-        self._border_timer = QtCore.QTimer(self)
-        self._border_timer.setInterval(80)
-        self._border_timer.timeout.connect(self._tick_follow_window)
+        self._move_hook: Optional[_WindowMoveHook] = None
         self._target_hwnd: Optional[int] = None
+        # 拖动/缩放时 LOCATIONCHANGE 会连续触发；合并为停止移动后的一次更新，避免闪烁
+        self._follow_debounce = QtCore.QTimer(self)
+        self._follow_debounce.setSingleShot(True)
+        self._follow_debounce.setInterval(60)
+        self._follow_debounce.timeout.connect(self._tick_follow_window)
+        self.target_moved.connect(self._follow_debounce.start, QtCore.Qt.QueuedConnection)
 
         # 默认存储目录
         self.default_dir = Path("recordings").resolve()
         self.default_dir.mkdir(parents=True, exist_ok=True)
         self.path_edit = QtWidgets.QLineEdit(str(self.default_dir / "sample.json"))
         self.path_browse = QtWidgets.QPushButton("浏览…")
+        # 默认紧凑 JSON，仅在需要人工查看时缩进
+        self.pretty_check = QtWidgets.QCheckBox("格式化 JSON")
         self.refresh_btn = QtWidgets.QPushButton("刷新窗口")
         self.start_btn = QtWidgets.QPushButton("开始录制")
         self.stop_btn = QtWidgets.QPushButton("停止录制")
@@ -125,10 +224,11 @@ class MainWindow(QtWidgets.QWidget):
         self.play_btn = QtWidgets.QPushButton("开始回放")
 
         layout = QtWidgets.QVBoxLayout(self)
-        layout.addWidget(QtWidgets.QLabel("输出文件(JSON):"))
+        layout.addWidget(QtWidgets.QLabel("输出文件(JSON/MessagePack):"))
         path_row = QtWidgets.QHBoxLayout()
         path_row.addWidget(self.path_edit)
         path_row.addWidget(self.path_browse)
+        path_row.addWidget(self.pretty_check)
         layout.addLayout(path_row)
         layout.addWidget(QtWidgets.QLabel("选择窗口:"))
         layout.addWidget(self.list_widget)
@@ -141,7 +241,7 @@ class MainWindow(QtWidgets.QWidget):
         layout.addLayout(btns)
 
         layout.addSpacing(12)
-        layout.addWidget(QtWidgets.QLabel("回放文件(JSON):"))
+        layout.addWidget(QtWidgets.QLabel("回放文件(JSON/MessagePack):"))
         play_row = QtWidgets.QHBoxLayout()
         play_row.addWidget(self.play_path)
         play_row.addWidget(self.play_btn)
@@ -232,8 +332,11 @@ class MainWindow(QtWidgets.QWidget):
         except Exception:
             self._stop_panel.setGeometry(200, 120, 120, 40)
         self._stop_panel.show()
-        # 不再跟随窗口，避免任何闪烁；需要时再启用
-        self._border_timer.stop()
+        # 目标窗口移动或缩放结束后让红框跟随（去抖动，不定时轮询）
+        try:
+            self._move_hook = _WindowMoveHook(hwnd, self.target_moved.emit)
+        except Exception:
+            self._move_hook = None
 
         def _worker() -> None:
             try:
@@ -260,7 +363,10 @@ class MainWindow(QtWidgets.QWidget):
         if self._stop_panel is not None:
             self._stop_panel.close()
             self._stop_panel = None
-        self._border_timer.stop()
+        if self._move_hook is not None:
+            self._move_hook.unhook()
+            self._move_hook = None
+        self._follow_debounce.stop()
         # 保存提示在 _prompt_save_payload 中处理
 
     @QtCore.Slot()
@@ -278,25 +384,31 @@ class MainWindow(QtWidgets.QWidget):
 
     @QtCore.Slot(object)
     def _prompt_save_payload(self, payload_obj: object) -> None:
-        import json as _json
         try:
             payload = list(payload_obj)  # type: ignore[assignment]
         except Exception:
             payload = []
         suggested = self.path_edit.text()
-        fn, _ = QtWidgets.QFileDialog.getSaveFileName(self, "保存录制为", suggested, "JSON (*.json)")
+        fn, _ = QtWidgets.QFileDialog.getSaveFileName(self, "保存录制为", suggested, RECORDING_FILTER)
         if not fn:
             self.status_label.setText("已取消保存（已丢弃本次录制）")
             return
-        try:
-            Path(fn).parent.mkdir(parents=True, exist_ok=True)
-            Path(fn).write_text(_json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-            self.path_edit.setText(fn)
-            self.status_label.setText(f"已保存: {fn}")
-            self.refresh_recordings()
-            QtWidgets.QMessageBox.information(self, "完成", f"录制已保存\n{fn}")
-        except Exception as e:
-            QtWidgets.QMessageBox.critical(self, "错误", f"保存失败: {e}")
+        # 序列化与写盘放到线程池，避免阻塞界面
+        self.status_label.setText(f"正在保存: {fn}")
+        task = _SaveTask(self, payload, fn, self.pretty_check.isChecked())
+        QtCore.QThreadPool.globalInstance().start(task)
+
+    @QtCore.Slot(str)
+    def _save_done(self, fn: str) -> None:
+        self.path_edit.setText(fn)
+        self.status_label.setText(f"已保存: {fn}")
+        self.refresh_recordings()
+        QtWidgets.QMessageBox.information(self, "完成", f"录制已保存\n{fn}")
+
+    @QtCore.Slot(str)
+    def _save_failed(self, msg: str) -> None:
+        self.status_label.setText("保存失败")
+        QtWidgets.QMessageBox.critical(self, "错误", f"保存失败: {msg}")
 
     def on_stop(self) -> None:
         if not self._recording:
@@ -317,16 +429,25 @@ class MainWindow(QtWidgets.QWidget):
         ctrl.release(keyboard.Key.esc)
 
     def on_browse_save(self) -> None:
-        fn, _ = QtWidgets.QFileDialog.getSaveFileName(self, "选择保存文件", self.path_edit.text(), "JSON (*.json)")
+        fn, _ = QtWidgets.QFileDialog.getSaveFileName(self, "选择保存文件", self.path_edit.text(), RECORDING_FILTER)
         if fn:
             self.path_edit.setText(fn)
 
     def refresh_recordings(self) -> None:
-        # 列出默认目录下的所有 json 作为回放下拉
+        # 列出默认目录下的所有录制文件作为回放下拉
         self.play_path.clear()
         try:
-            for p in sorted(self.default_dir.glob("*.json")):
-                self.play_path.addItem(str(p))
+            with os.scandir(self.default_dir) as it:
+                names = [
+                    e.name
+                    for e in it
+                    # 与 Windows 下 glob 一致，扩展名不区分大小写
+                    if e.name.lower().endswith(RECORDING_SUFFIXES)
+                    and e.is_file(follow_symlinks=False)
+                ]
+            names.sort()
+            for n in names:
+                self.play_path.addItem(str(self.default_dir / n))
         except Exception:
             pass
 
@@ -351,7 +472,6 @@ class MainWindow(QtWidgets.QWidget):
         """Convert physical screen pixels (Win32) to Qt logical pixels under DPI scaling."""
         try:
             user32 = ctypes.windll.user32  # type: ignore[attr-defined]
-            user32.SetProcessDPIAware()
             dpi = user32.GetDpiForWindow(ctypes.wintypes.HWND(hwnd))  # type: ignore[attr-defined]
             scale = dpi / 96.0 if dpi else 1.0
         except Exception:
@@ -408,6 +528,8 @@ class MainWindow(QtWidgets.QWidget):
 
 def run() -> None:
     app = QtWidgets.QApplication(sys.argv)
+    with contextlib.suppress(Exception):
+        ctypes.windll.user32.SetProcessDPIAware()  # type: ignore[attr-defined]
     w = MainWindow()
     w.show()
     sys.exit(app.exec())
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
-import json
+import array
+import ctypes
+import os
+import sys
 import time
 import threading
-from dataclasses import dataclass, asdict
+from collections import Counter
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Literal, Optional
+from typing import Any, BinaryIO, Callable, Dict, List, Literal, Optional, cast
 
+import msgpack
+import orjson
 from pynput import keyboard, mouse
 try:
     import win32gui  # type: ignore
@@ -25,26 +31,130 @@ EventType = Literal[
 
 @dataclass
 class RecordedEvent:
+    """Shape of one entry in a recording file."""
+
     t: EventType
     dt: float
     data: Dict[str, Any]
 
 
+# Small integer tags stored while recording; mapped back to names on serialize
+_KEY_PRESS, _KEY_RELEASE, _MOUSE_MOVE, _MOUSE_CLICK, _MOUSE_SCROLL = range(5)
+_TAG_NAMES: tuple[EventType, ...] = (
+    "key_press",
+    "key_release",
+    "mouse_move",
+    "mouse_click",
+    "mouse_scroll",
+)
+_TAG_IDS: Dict[str, int] = {name: i for i, name in enumerate(_TAG_NAMES)}
+
+# Statement run by the generated replay dispatcher for each non-move event
+# type; ``d`` is the event data
+_DISPATCH_BODIES: Dict[int, str] = {
+    _KEY_PRESS: "kpress(str_to_key(d['key']))",
+    _KEY_RELEASE: "krelease(str_to_key(d['key']))",
+    _MOUSE_CLICK: "(mpress if d['pressed'] else mrelease)(buttons[d['button']])",
+    _MOUSE_SCROLL: "mscroll(d['dx'], d['dy'])",
+}
+
+# How often a streamed (.jsonl) recording is appended to disk
+_STREAM_FLUSH_INTERVAL = 0.25
+
+# Consecutive moves closer than this are replayed together as one burst
+_MOVE_BATCH_WINDOW = 0.004
+
+
+class _EventColumns:
+    """Struct-of-arrays event buffer; dicts are only built by ``to_payload``."""
+
+    __slots__ = ("t", "dt", "x", "y", "keys", "clicks", "sdx", "sdy")
+
+    def __init__(self) -> None:
+        self.t: List[int] = []
+        self.dt = array.array("d")
+        # x/y for every mouse event, in order
+        self.x = array.array("i")
+        self.y = array.array("i")
+        # per-kind side columns, consumed in order by to_payload
+        self.keys: List[str] = []
+        self.clicks: List[tuple[str, bool]] = []
+        self.sdx = array.array("i")
+        self.sdy = array.array("i")
+
+    def __len__(self) -> int:
+        return len(self.t)
+
+    def to_payload(self) -> List[Dict[str, Any]]:
+        payload: List[Dict[str, Any]] = []
+        append = payload.append
+        xs, ys, keys, clicks, sdx, sdy = self.x, self.y, self.keys, self.clicks, self.sdx, self.sdy
+        m = k = c = s = 0
+        for tag, dt in zip(self.t, self.dt):
+            if tag == _MOUSE_MOVE:
+                data: Dict[str, Any] = {"x": xs[m], "y": ys[m]}
+                m += 1
+            elif tag in (_KEY_PRESS, _KEY_RELEASE):
+                data = {"key": keys[k]}
+                k += 1
+            elif tag == _MOUSE_CLICK:
+                button, pressed = clicks[c]
+                data = {"x": xs[m], "y": ys[m], "button": button, "pressed": pressed}
+                m += 1
+                c += 1
+            else:
+                data = {"x": xs[m], "y": ys[m], "dx": sdx[s], "dy": sdy[s]}
+                m += 1
+                s += 1
+            append({"t": _TAG_NAMES[tag], "dt": dt, "data": data})
+        return payload
+
+
 class ActionRecorder:
-    def __init__(self, target_hwnd: Optional[int] = None) -> None:
-        self._events: List[RecordedEvent] = []
+    def __init__(
+        self,
+        target_hwnd: Optional[int] = None,
+        move_min_dt: float = 0.008,
+        move_min_px: int = 2,
+    ) -> None:
+        self._cols = _EventColumns()
+        # keyboard and mouse listeners run on separate threads; a row spans
+        # several columns so appends must not interleave
+        self._lock = threading.Lock()
         self._start_ts: Optional[float] = None
-        self._target_hwnd = target_hwnd
+        self._target_hwnd = int(target_hwnd) if target_hwnd is not None else None
         self._stop_event: threading.Event = threading.Event()
         self._kb_listener: Optional[keyboard.Listener] = None
         self._ms_listener: Optional[mouse.Listener] = None
+        # mouse_move coalescing: a move is kept only if enough time has passed
+        # or the cursor travelled far enough since the last kept move
+        self._move_min_dt = move_min_dt
+        self._move_min_px = move_min_px
+        self._last_move_t: float = -1.0
+        self._last_move_xy: tuple[int, int] = (-10**9, -10**9)
+        self._pending_move: Optional[tuple[float, int, int]] = None
+        # GetForegroundWindow is cached briefly instead of queried per event
+        self._fg_cache_ts: float = 0.0
+        self._fg_cache_hwnd: int = 0
+        self._fg_cache_ttl: float = 0.05
 
     def _now_delta(self) -> float:
         assert self._start_ts is not None
         return time.perf_counter() - self._start_ts
 
-    def record(self, output_file: Optional[Path] = None) -> List[Dict[str, Any]]:
-        self._events.clear()
+    def record(
+        self, output_file: Optional[Path] = None, pretty: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Record until stopped and return the events.
+
+        JSON output is compact unless ``pretty`` is set. A ``.jsonl`` output is
+        streamed to disk while recording instead of being held in memory; in
+        that case an empty list is returned.
+        """
+        self._cols = _EventColumns()
+        self._last_move_t = -1.0
+        self._last_move_xy = (-10**9, -10**9)
+        self._pending_move = None
         self._start_ts = time.perf_counter()
 
         kb_listener = keyboard.Listener(
@@ -56,94 +166,158 @@ class ActionRecorder:
 
         self._kb_listener = kb_listener
         self._ms_listener = ms_listener
+        if output_file is not None and output_file.suffix.lower() == ".jsonl":
+            self._record_streaming(output_file, kb_listener, ms_listener)
+            return []
+
         kb_listener.start()
         ms_listener.start()
 
         try:
-            while not self._stop_event.is_set():
-                time.sleep(0.05)
+            # listeners run on their own threads; just block until stopped. The
+            # timeout keeps Ctrl+C working on Windows, where an untimed wait
+            # cannot be interrupted
+            while not self._stop_event.wait(1.0):
+                pass
         finally:
             kb_listener.stop()
             ms_listener.stop()
 
-        payload = [asdict(e) for e in self._events]
+        with self._lock:
+            self._flush_pending_move()
+        payload = self._to_payload()
         if output_file is not None:
-            output_file.parent.mkdir(parents=True, exist_ok=True)
-            output_file.write_text(
-                json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8"
-            )
+            save_recording(payload, output_file, pretty=pretty)
         return payload
 
+    def _to_payload(self) -> List[Dict[str, Any]]:
+        return self._cols.to_payload()
+
+    def _record_streaming(
+        self, output_file: Path, kb_listener: keyboard.Listener, ms_listener: mouse.Listener
+    ) -> None:
+        # The hooks keep appending to the in-memory columns; this thread swaps
+        # them out periodically and writes them as JSON lines, so memory stays
+        # bounded and nothing is left to serialize when recording stops.
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        part = output_file.with_name(output_file.name + ".part")
+        try:
+            with part.open("wb", buffering=1 << 20) as fp:
+                kb_listener.start()
+                ms_listener.start()
+                try:
+                    while not self._stop_event.wait(_STREAM_FLUSH_INTERVAL):
+                        self._drain_to(fp)
+                finally:
+                    kb_listener.stop()
+                    ms_listener.stop()
+                with self._lock:
+                    self._flush_pending_move()
+                self._drain_to(fp)
+            os.replace(part, output_file)
+        except BaseException:
+            part.unlink(missing_ok=True)
+            raise
+
+    def _drain_to(self, fp: BinaryIO) -> None:
+        with self._lock:
+            cols, self._cols = self._cols, _EventColumns()
+        if cols:
+            _write_jsonl(fp, cols.to_payload())
+
     # Keyboard handlers
     def _on_key_press(self, key: keyboard.Key | keyboard.KeyCode) -> None:
         if not self._accept_event():
             return
-        self._events.append(
-            RecordedEvent(
-                t="key_press",
-                dt=self._now_delta(),
-                data={"key": _key_to_str(key)},
-            )
-        )
+        self._append_key(_KEY_PRESS, _key_to_str(key))
 
     def _on_key_release(self, key: keyboard.Key | keyboard.KeyCode) -> None:
-        # Stop recording if ESC is released
-        if _key_to_str(key) == "Key.esc":
-            self._events.append(
-                RecordedEvent(
-                    t="key_release",
-                    dt=self._now_delta(),
-                    data={"key": _key_to_str(key)},
-                )
-            )
+        # Stop recording if ESC is released; compared by identity so rejected
+        # releases of other keys are not stringified
+        if key is keyboard.Key.esc:
+            self._append_key(_KEY_RELEASE, "Key.esc")
             self._stop_event.set()
             return
         if not self._accept_event():
             return
-        self._events.append(
-            RecordedEvent(
-                t="key_release",
-                dt=self._now_delta(),
-                data={"key": _key_to_str(key)},
-            )
-        )
+        self._append_key(_KEY_RELEASE, _key_to_str(key))
+
+    def _append_key(self, tag: int, key: str) -> None:
+        with self._lock:
+            self._flush_pending_move()
+            c = self._cols
+            c.t.append(tag)
+            c.dt.append(self._now_delta())
+            c.keys.append(key)
 
     # Mouse handlers
     def _on_move(self, x: int, y: int) -> None:
         if not self._accept_event():
             return
-        self._events.append(RecordedEvent(t="mouse_move", dt=self._now_delta(), data={"x": x, "y": y}))
+        with self._lock:
+            dt = self._now_delta()
+            lx, ly = self._last_move_xy
+            if (
+                dt - self._last_move_t < self._move_min_dt
+                and abs(x - lx) + abs(y - ly) < self._move_min_px
+            ):
+                # keep the latest dropped sample so the final position is not lost
+                self._pending_move = (dt, x, y)
+                return
+            self._append_move(dt, x, y)
+
+    def _append_move(self, dt: float, x: int, y: int) -> None:
+        c = self._cols
+        c.t.append(_MOUSE_MOVE)
+        c.dt.append(dt)
+        c.x.append(x)
+        c.y.append(y)
+        self._last_move_t = dt
+        self._last_move_xy = (x, y)
+        self._pending_move = None
+
+    def _flush_pending_move(self) -> None:
+        # Called before every other event is appended: clicks and scrolls replay
+        # at the current cursor position, and rows must stay in dt order
+        if self._pending_move is not None:
+            self._append_move(*self._pending_move)
 
     def _on_click(self, x: int, y: int, button: mouse.Button, pressed: bool) -> None:
         if not self._accept_event():
             return
-        self._events.append(
-            RecordedEvent(
-                t="mouse_click",
-                dt=self._now_delta(),
-                data={"x": x, "y": y, "button": button.name, "pressed": pressed},
-            )
-        )
+        with self._lock:
+            self._flush_pending_move()
+            c = self._cols
+            c.t.append(_MOUSE_CLICK)
+            c.dt.append(self._now_delta())
+            c.x.append(x)
+            c.y.append(y)
+            c.clicks.append((button.name, pressed))
 
     def _on_scroll(self, x: int, y: int, dx: int, dy: int) -> None:
         if not self._accept_event():
             return
-        self._events.append(
-            RecordedEvent(
-                t="mouse_scroll",
-                dt=self._now_delta(),
-                data={"x": x, "y": y, "dx": dx, "dy": dy},
-            )
-        )
+        with self._lock:
+            self._flush_pending_move()
+            c = self._cols
+            c.t.append(_MOUSE_SCROLL)
+            c.dt.append(self._now_delta())
+            c.x.append(x)
+            c.y.append(y)
+            c.sdx.append(dx)
+            c.sdy.append(dy)
 
     def _accept_event(self) -> bool:
         if self._target_hwnd is None or win32gui is None:
             return True
-        try:
-            fg = win32gui.GetForegroundWindow()
-            return int(fg) == int(self._target_hwnd)
-        except Exception:
-            return True
+        now = time.perf_counter()
+        if now - self._fg_cache_ts > self._fg_cache_ttl:
+            try:
+                self._fg_cache_hwnd = int(win32gui.GetForegroundWindow())
+            except Exception:
+                return True
+            self._fg_cache_ts = now
+        return self._fg_cache_hwnd == self._target_hwnd
 
     def request_stop(self) -> None:
         self._stop_event.set()
@@ -153,37 +327,292 @@ class ActionReplayer:
     def __init__(self) -> None:
         self._keyboard = keyboard.Controller()
         self._mouse = mouse.Controller()
+        self._timer = _HighResTimer()
+        self._mover = _SendInputMover()
+        # resolved once so the replay loop does no enum/method lookups
+        self._buttons: Dict[str, mouse.Button] = {b.name: b for b in mouse.Button}
+        self._kpress = self._keyboard.press
+        self._krelease = self._keyboard.release
+        self._mpress = self._mouse.press
+        self._mrelease = self._mouse.release
+        self._mscroll = self._mouse.scroll
+
+    def __del__(self) -> None:
+        timer = getattr(self, "_timer", None)
+        if timer is not None:
+            timer.close()
 
     def replay(self, input_file: Path) -> None:
-        raw = json.loads(input_file.read_text(encoding="utf-8"))
-        events = [RecordedEvent(**e) for e in raw]
-
-        if not events:
+        raw = load_recording(input_file)
+        if not raw:
             return
 
+        tags = [_TAG_IDS.get(ev["t"], -1) for ev in raw]
+        dts = array.array("d", [ev["dt"] for ev in raw])
+        datas = [ev["data"] for ev in raw]
+        dispatch = self._build_dispatcher(tags)
+        sleep_until = self._timer.sleep_until
+        mover = self._mover
+        mover.refresh_screen()
+        n = len(raw)
+        i = 0
         start = time.perf_counter()
-        for ev in events:
-            target = start + ev.dt
-            _sleep_until(target)
-            self._dispatch(ev)
-
-    def _dispatch(self, ev: RecordedEvent) -> None:
-        if ev.t == "key_press":
-            k = _str_to_key(ev.data["key"])
-            self._keyboard.press(k)
-        elif ev.t == "key_release":
-            k = _str_to_key(ev.data["key"])
-            self._keyboard.release(k)
-        elif ev.t == "mouse_move":
-            self._mouse.position = (ev.data["x"], ev.data["y"])
-        elif ev.t == "mouse_click":
-            btn = getattr(mouse.Button, ev.data["button"])  # left/right/middle
-            if ev.data["pressed"]:
-                self._mouse.press(btn)
-            else:
-                self._mouse.release(btn)
-        elif ev.t == "mouse_scroll":
-            self._mouse.scroll(ev.data["dx"], ev.data["dy"])
+        while i < n:
+            tag = tags[i]
+            if tag == _MOUSE_MOVE:
+                # A burst of moves is sent at the time of its last sample: as a
+                # single SendInput batch where available, otherwise only the
+                # final (visible) position is set
+                j = i
+                limit = dts[i] + _MOVE_BATCH_WINDOW
+                while j + 1 < n and tags[j + 1] == _MOUSE_MOVE and dts[j + 1] <= limit:
+                    j += 1
+                sleep_until(start + dts[j])
+                if not mover.send(datas, i, j + 1):
+                    self._do_move(datas[j])
+                i = j + 1
+                continue
+            sleep_until(start + dts[i])
+            dispatch(tag, datas[i])
+            i += 1
+
+    def _build_dispatcher(self, tags: List[int]) -> Callable[[int, Dict[str, Any]], None]:
+        """Compile an if/elif dispatcher testing this file's most common event types first.
+
+        Moves are handled by the burst path in ``replay``; unknown tags match no
+        branch and are ignored.
+        """
+        namespace: Dict[str, Any] = {
+            "kpress": self._kpress,
+            "krelease": self._krelease,
+            "mpress": self._mpress,
+            "mrelease": self._mrelease,
+            "mscroll": self._mscroll,
+            "buttons": self._buttons,
+            "str_to_key": _str_to_key,
+        }
+        exec(compile(_dispatcher_source(tags), "<replay-dispatch>", "exec"), namespace)
+        return cast(Callable[[int, Dict[str, Any]], None], namespace["dispatch"])
+
+    def _do_move(self, data: Dict[str, Any]) -> None:
+        self._mouse.position = (data["x"], data["y"])
+
+
+def _dispatcher_source(tags: List[int]) -> str:
+    """Source of the replay dispatcher, branching on the most common tags first."""
+    counts = Counter(t for t in tags if t in _DISPATCH_BODIES)
+    lines = [
+        "def dispatch(t, d, kpress=kpress, krelease=krelease, mpress=mpress,"
+        " mrelease=mrelease, mscroll=mscroll, buttons=buttons, str_to_key=str_to_key):"
+    ]
+    for k, (tag, _) in enumerate(counts.most_common()):
+        lines.append(f"    {'if' if k == 0 else 'elif'} t == {tag}:")
+        lines.append(f"        {_DISPATCH_BODIES[tag]}")
+    if len(lines) == 1:
+        lines.append("    pass")
+    return "\n".join(lines)
+
+
+def save_recording(
+    payload: List[Dict[str, Any]], output_file: Path, pretty: bool = False
+) -> None:
+    """Write a recording as ``.msgpack``, ``.jsonl`` (one event per line) or JSON."""
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    if output_file.suffix.lower() == ".msgpack":
+        output_file.write_bytes(msgpack.packb(payload, use_bin_type=True))
+        return
+    if output_file.suffix.lower() == ".jsonl":
+        with output_file.open("wb") as fp:
+            _write_jsonl(fp, payload)
+        return
+    option = orjson.OPT_INDENT_2 if pretty else 0
+    output_file.write_bytes(orjson.dumps(payload, option=option))
+
+
+def load_recording(input_file: Path) -> List[Dict[str, Any]]:
+    if input_file.suffix.lower() == ".jsonl":
+        # parsed line by line to avoid one large read_bytes(); the events
+        # themselves are still all returned as a list
+        with input_file.open("rb") as fp:
+            return [orjson.loads(line) for line in fp if line.strip()]
+    raw = input_file.read_bytes()
+    if input_file.suffix.lower() == ".msgpack":
+        return cast(List[Dict[str, Any]], msgpack.unpackb(raw, raw=False))
+    return cast(List[Dict[str, Any]], orjson.loads(raw))
+
+
+def _write_jsonl(fp: BinaryIO, payload: List[Dict[str, Any]]) -> None:
+    dumps = orjson.dumps
+    fp.writelines(dumps(ev, option=orjson.OPT_APPEND_NEWLINE) for ev in payload)
+
+
+class _MOUSEINPUT(ctypes.Structure):
+    _fields_ = [
+        ("dx", ctypes.c_int32),
+        ("dy", ctypes.c_int32),
+        ("mouseData", ctypes.c_uint32),
+        ("dwFlags", ctypes.c_uint32),
+        ("time", ctypes.c_uint32),
+        ("dwExtraInfo", ctypes.c_size_t),
+    ]
+
+
+class _INPUTUNION(ctypes.Union):
+    # MOUSEINPUT is the largest member, so the union already has the Win32 size
+    _fields_ = [("mi", _MOUSEINPUT)]
+
+
+class _INPUT(ctypes.Structure):
+    _fields_ = [("type", ctypes.c_uint32), ("u", _INPUTUNION)]
+
+
+class _SendInputMover:
+    """Absolute cursor moves injected in batches with ``SendInput`` (Windows only)."""
+
+    _INPUT_MOUSE = 0
+    _MOUSEEVENTF_MOVE = 0x0001
+    _MOUSEEVENTF_VIRTUALDESK = 0x4000
+    _MOUSEEVENTF_ABSOLUTE = 0x8000
+    _SM_XVIRTUALSCREEN = 76
+    _SM_YVIRTUALSCREEN = 77
+    _SM_CXVIRTUALSCREEN = 78
+    _SM_CYVIRTUALSCREEN = 79
+    _BATCH = 64
+
+    def __init__(self) -> None:
+        self._user32: Any = None
+        self._buf = (_INPUT * self._BATCH)()
+        self._origin = (0, 0)
+        self._size = (1, 1)
+        if sys.platform != "win32":
+            return
+        try:
+            user32 = ctypes.WinDLL("user32", use_last_error=True)
+            user32.SendInput.argtypes = [ctypes.c_uint, ctypes.POINTER(_INPUT), ctypes.c_int]
+            user32.SendInput.restype = ctypes.c_uint
+        except Exception:
+            return
+        flags = self._MOUSEEVENTF_MOVE | self._MOUSEEVENTF_ABSOLUTE | self._MOUSEEVENTF_VIRTUALDESK
+        for inp in self._buf:
+            inp.type = self._INPUT_MOUSE
+            inp.u.mi.dwFlags = flags
+        self._user32 = user32
+
+    def refresh_screen(self) -> None:
+        if self._user32 is None:
+            return
+        metrics = self._user32.GetSystemMetrics
+        self._origin = (metrics(self._SM_XVIRTUALSCREEN), metrics(self._SM_YVIRTUALSCREEN))
+        self._size = (
+            max(metrics(self._SM_CXVIRTUALSCREEN), 2),
+            max(metrics(self._SM_CYVIRTUALSCREEN), 2),
+        )
+
+    def send(self, datas: List[Dict[str, Any]], lo: int, hi: int) -> bool:
+        """Move through ``datas[lo:hi]``; False means the caller must fall back."""
+        user32 = self._user32
+        if user32 is None:
+            return False
+        buf = self._buf
+        ox, oy = self._origin
+        # absolute coordinates are normalized to 0..65535 over the virtual desktop
+        sx = 65535 / (self._size[0] - 1)
+        sy = 65535 / (self._size[1] - 1)
+        size = ctypes.sizeof(_INPUT)
+        while lo < hi:
+            count = min(hi - lo, self._BATCH)
+            for k in range(count):
+                d = datas[lo + k]
+                mi = buf[k].u.mi
+                mi.dx = round((d["x"] - ox) * sx)
+                mi.dy = round((d["y"] - oy) * sy)
+            if user32.SendInput(count, buf, size) != count:
+                return False
+            lo += count
+        return True
+
+
+class _HighResTimer:
+    """Sleep with a high-resolution waitable timer on Windows (loop elsewhere)."""
+
+    _CREATE_WAITABLE_TIMER_HIGH_RESOLUTION = 0x00000002
+    _TIMER_ALL_ACCESS = 0x1F0003
+    _INFINITE = 0xFFFFFFFF
+
+    def __init__(self) -> None:
+        self._handle: Optional[int] = None
+        self._kernel32: Any = None
+        self._winmm: Any = None
+        if sys.platform != "win32":
+            return
+        handle = None
+        try:
+            from ctypes import wintypes
+
+            kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+            kernel32.CreateWaitableTimerExW.argtypes = [
+                ctypes.c_void_p,
+                wintypes.LPCWSTR,
+                wintypes.DWORD,
+                wintypes.DWORD,
+            ]
+            kernel32.CreateWaitableTimerExW.restype = wintypes.HANDLE
+            kernel32.SetWaitableTimer.argtypes = [
+                wintypes.HANDLE,
+                ctypes.POINTER(ctypes.c_int64),
+                wintypes.LONG,
+                ctypes.c_void_p,
+                ctypes.c_void_p,
+                wintypes.BOOL,
+            ]
+            kernel32.SetWaitableTimer.restype = wintypes.BOOL
+            kernel32.WaitForSingleObject.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+            kernel32.WaitForSingleObject.restype = wintypes.DWORD
+            kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+
+            handle = kernel32.CreateWaitableTimerExW(
+                None, None, self._CREATE_WAITABLE_TIMER_HIGH_RESOLUTION, self._TIMER_ALL_ACCESS
+            )
+            if not handle:
+                # HIGH_RESOLUTION needs Windows 10 1803+; a plain timer still
+                # benefits from timeBeginPeriod(1)
+                handle = kernel32.CreateWaitableTimerExW(None, None, 0, self._TIMER_ALL_ACCESS)
+            if not handle:
+                return
+            winmm = ctypes.WinDLL("winmm")
+            winmm.timeBeginPeriod(1)
+        except Exception:
+            if handle:
+                kernel32.CloseHandle(handle)
+            return
+        self._kernel32 = kernel32
+        self._winmm = winmm
+        self._handle = handle
+
+    def sleep_until(self, target_ts: float) -> None:
+        remaining = target_ts - time.perf_counter()
+        if remaining <= 0:
+            return
+        if self._handle is None:
+            _sleep_until(target_ts)
+            return
+        # Negative due time = relative, in 100 ns units
+        due = ctypes.c_int64(-int(remaining * 10_000_000))
+        if not self._kernel32.SetWaitableTimer(
+            self._handle, ctypes.byref(due), 0, None, None, False
+        ):
+            _sleep_until(target_ts)
+            return
+        self._kernel32.WaitForSingleObject(self._handle, self._INFINITE)
+
+    def close(self) -> None:
+        if self._handle is None:
+            return
+        try:
+            self._winmm.timeEndPeriod(1)
+            self._kernel32.CloseHandle(self._handle)
+        finally:
+            self._handle = None
 
 
 def _sleep_until(target_ts: float) -> None:
@@ -195,7 +624,15 @@ def _sleep_until(target_ts: float) -> None:
         time.sleep(min(remaining, 0.01))
 
 
+# Key members are singletons that live for the whole process, so their
+# strings can be looked up by identity; KeyCode chars are returned directly
+_KEY_STR_CACHE: Dict[int, str] = {id(k): str(k) for k in keyboard.Key}
+
+
 def _key_to_str(key: keyboard.Key | keyboard.KeyCode) -> str:
+    cached = _KEY_STR_CACHE.get(id(key))
+    if cached is not None:
+        return cached
     try:
         if isinstance(key, keyboard.KeyCode) and key.char is not None:
             return key.char
@@ -204,14 +641,19 @@ def _key_to_str(key: keyboard.Key | keyboard.KeyCode) -> str:
         return str(key)
 
 
+# Recorded key strings -> pynput keys; special keys are known up front and
+# everything else is memoized the first time it is seen
+_KEY_CACHE: Dict[str, keyboard.Key | keyboard.KeyCode] = {str(k): k for k in keyboard.Key}
+_keycode_from_char = keyboard.KeyCode.from_char
+
+
 def _str_to_key(s: str) -> keyboard.Key | keyboard.KeyCode:
-    # Map back common special keys, otherwise assume a single char
-    if s.startswith("Key."):
-        name = s.split(".", 1)[1]
-        return getattr(keyboard.Key, name)
-    if len(s) == 1:
-        return keyboard.KeyCode.from_char(s)
-    # Fallback to KeyCode for strings
-    return keyboard.KeyCode.from_char(s)
+    k = _KEY_CACHE.get(s)
+    if k is not None:
+        return k
+    # Map back common special keys, otherwise fall back to KeyCode for strings
+    k = getattr(keyboard.Key, s.split(".", 1)[1]) if s.startswith("Key.") else _keycode_from_char(s)
+    _KEY_CACHE[s] = k
+    return k
 
 
@@ -0,0 +1,79 @@
+"""Replace pynput with an in-memory stand-in so recorder logic runs headless.
+
+The real package needs a display/input backend and its controllers would
+drive the actual mouse and keyboard, so it is never used by the tests.
+"""
+
+from __future__ import annotations
+
+import enum
+import sys
+import types
+from typing import Any
+
+
+class Key(enum.Enum):
+    esc = 1
+    shift = 2
+    enter = 3
+
+
+class KeyCode:
+    def __init__(self, char: str | None = None) -> None:
+        self.char = char
+
+    @classmethod
+    def from_char(cls, char: str) -> KeyCode:
+        return cls(char)
+
+    def __repr__(self) -> str:
+        return f"KeyCode({self.char!r})"
+
+
+class Button(enum.Enum):
+    left = 1
+    right = 2
+    middle = 3
+
+
+class _Controller:
+    def __init__(self) -> None:
+        self.calls: list[tuple[Any, ...]] = []
+
+    def press(self, key: Any) -> None:
+        self.calls.append(("press", key))
+
+    def release(self, key: Any) -> None:
+        self.calls.append(("release", key))
+
+    def scroll(self, dx: int, dy: int) -> None:
+        self.calls.append(("scroll", dx, dy))
+
+    @property
+    def position(self) -> tuple[int, int]:
+        return (0, 0)
+
+    @position.setter
+    def position(self, pos: tuple[int, int]) -> None:
+        self.calls.append(("position", pos))
+
+
+class _Listener:
+    def __init__(self, **callbacks: Any) -> None:
+        self.callbacks = callbacks
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+_pynput = types.ModuleType("pynput")
+_pynput.keyboard = types.SimpleNamespace(  # type: ignore[attr-defined]
+    Key=Key, KeyCode=KeyCode, Controller=_Controller, Listener=_Listener
+)
+_pynput.mouse = types.SimpleNamespace(  # type: ignore[attr-defined]
+    Button=Button, Controller=_Controller, Listener=_Listener
+)
+sys.modules["pynput"] = _pynput
@@ -0,0 +1,204 @@
+import threading
+import time
+
+import pytest
+from pynput import keyboard, mouse
+
+from game_test_py.tools.recorder import (
+    _KEY_PRESS,
+    _MOUSE_CLICK,
+    _MOUSE_SCROLL,
+    ActionRecorder,
+    ActionReplayer,
+    _dispatcher_source,
+    _str_to_key,
+    load_recording,
+    save_recording,
+)
+
+SAMPLE_PAYLOAD = [
+    {"t": "mouse_move", "dt": 0.01, "data": {"x": 1, "y": 2}},
+    {"t": "key_press", "dt": 0.02, "data": {"key": "中"}},
+    {"t": "mouse_click", "dt": 0.03, "data": {"x": 1, "y": 2, "button": "left", "pressed": True}},
+    {"t": "mouse_scroll", "dt": 0.04, "data": {"x": 1, "y": 2, "dx": 0, "dy": -1}},
+    {"t": "key_release", "dt": 0.05, "data": {"key": "Key.esc"}},
+]
+
+
+def _started_recorder(**kwargs) -> ActionRecorder:
+    rec = ActionRecorder(**kwargs)
+    rec._start_ts = time.perf_counter()
+    return rec
+
+
+def test_to_payload_rebuilds_events_in_order():
+    rec = _started_recorder()
+    rec._on_move(1, 2)
+    rec._on_key_press(keyboard.KeyCode.from_char("a"))
+    rec._on_click(3, 4, mouse.Button.left, True)
+    rec._on_scroll(5, 6, 0, -1)
+    rec._on_key_release(keyboard.Key.shift)
+
+    payload = rec._to_payload()
+
+    assert [(e["t"], e["data"]) for e in payload] == [
+        ("mouse_move", {"x": 1, "y": 2}),
+        ("key_press", {"key": "a"}),
+        ("mouse_click", {"x": 3, "y": 4, "button": "left", "pressed": True}),
+        ("mouse_scroll", {"x": 5, "y": 6, "dx": 0, "dy": -1}),
+        ("key_release", {"key": "Key.shift"}),
+    ]
+    assert all(isinstance(e["dt"], float) for e in payload)
+
+
+def test_to_payload_empty():
+    assert _started_recorder()._to_payload() == []
+
+
+def test_move_coalescing_drops_small_fast_moves():
+    rec = _started_recorder(move_min_dt=10.0, move_min_px=5)
+    rec._on_move(0, 0)
+    rec._on_move(1, 1)
+    rec._on_move(2, 1)
+    rec._on_move(10, 1)
+
+    moves = [e["data"] for e in rec._to_payload()]
+
+    assert moves == [{"x": 0, "y": 0}, {"x": 10, "y": 1}]
+
+
+def test_coalesced_move_is_flushed_before_next_event():
+    rec = _started_recorder(move_min_dt=10.0, move_min_px=5)
+    rec._on_move(0, 0)
+    rec._on_move(1, 0)  # held back
+    rec._on_click(1, 0, mouse.Button.left, True)
+
+    payload = rec._to_payload()
+
+    assert [e["t"] for e in payload] == ["mouse_move", "mouse_move", "mouse_click"]
+    assert payload[1]["data"] == {"x": 1, "y": 0}
+
+
+def test_payload_dt_never_decreases_with_held_back_move():
+    rec = _started_recorder(move_min_dt=10.0, move_min_px=5)
+    rec._on_move(10, 10)
+    rec._on_move(11, 10)  # held back
+    rec._on_key_press(keyboard.KeyCode.from_char("a"))
+    rec._on_key_release(keyboard.KeyCode.from_char("a"))
+    rec._on_key_release(keyboard.Key.esc)
+    with rec._lock:
+        rec._flush_pending_move()
+
+    payload = rec._to_payload()
+    dts = [e["dt"] for e in payload]
+
+    assert dts == sorted(dts)
+    assert [e["t"] for e in payload] == [
+        "mouse_move",
+        "mouse_move",
+        "key_press",
+        "key_release",
+        "key_release",
+    ]
+    assert payload[-1]["data"] == {"key": "Key.esc"}
+
+
+@pytest.mark.parametrize("suffix", [".json", ".jsonl", ".msgpack"])
+def test_save_load_round_trip(tmp_path, suffix):
+    path = tmp_path / "sub" / f"rec{suffix}"
+    save_recording(SAMPLE_PAYLOAD, path)
+
+    assert load_recording(path) == SAMPLE_PAYLOAD
+
+
+def test_json_is_compact_utf8(tmp_path):
+    path = tmp_path / "rec.json"
+    save_recording(SAMPLE_PAYLOAD, path)
+
+    text = path.read_text(encoding="utf-8")
+    assert "\n" not in text
+    assert "中" in text
+
+
+def test_str_to_key_special_keys():
+    assert _str_to_key("Key.esc") is keyboard.Key.esc
+    assert _str_to_key("Key.shift") is keyboard.Key.shift
+
+
+def test_str_to_key_memoizes_chars():
+    first = _str_to_key("q")
+    assert isinstance(first, keyboard.KeyCode)
+    assert first.char == "q"
+    assert _str_to_key("q") is first
+
+
+def test_record_streams_jsonl(tmp_path):
+    rec = ActionRecorder(move_min_dt=10.0, move_min_px=5)
+    path = tmp_path / "rec.jsonl"
+
+    def _feed():
+        rec._on_move(0, 0)
+        rec._on_move(1, 0)  # held back until the key press
+        rec._on_key_press(keyboard.KeyCode.from_char("a"))
+        rec._on_key_release(keyboard.Key.esc)
+
+    # start feeding only once record() has set the start timestamp
+    feeder = threading.Timer(0.05, _feed)
+    feeder.start()
+    assert rec.record(path) == []
+    feeder.join()
+
+    events = load_recording(path)
+    assert [e["t"] for e in events] == ["mouse_move", "mouse_move", "key_press", "key_release"]
+    assert not path.with_name("rec.jsonl.part").exists()
+
+
+def test_record_streaming_removes_part_file_on_error(tmp_path, monkeypatch):
+    rec = ActionRecorder()
+    path = tmp_path / "rec.jsonl"
+
+    def _boom(fp):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(rec, "_drain_to", _boom)
+    rec.request_stop()
+
+    with pytest.raises(OSError):
+        rec.record(path)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_format_detection_ignores_suffix_case(tmp_path):
+    path = tmp_path / "REC.MSGPACK"
+    save_recording(SAMPLE_PAYLOAD, path)
+
+    assert path.read_bytes()[:1] != b"["
+    assert load_recording(path) == SAMPLE_PAYLOAD
+
+
+def test_dispatcher_source_tests_most_common_tag_first():
+    lines = _dispatcher_source([_KEY_PRESS, _MOUSE_CLICK, _MOUSE_CLICK, -1]).splitlines()
+
+    assert lines.index(f"    if t == {_MOUSE_CLICK}:") < lines.index(f"    elif t == {_KEY_PRESS}:")
+    assert not any("t == -1" in line for line in lines)
+
+
+def test_build_dispatcher_dispatches_and_ignores_unknown():
+    replayer = ActionReplayer()
+    dispatch = replayer._build_dispatcher([_KEY_PRESS, _MOUSE_CLICK])
+
+    dispatch(_KEY_PRESS, {"key": "Key.esc"})
+    dispatch(_MOUSE_CLICK, {"x": 0, "y": 0, "button": "right", "pressed": False})
+    dispatch(_MOUSE_SCROLL, {"x": 0, "y": 0, "dx": 0, "dy": 1})  # no branch generated
+    dispatch(-1, {})
+
+    assert replayer._keyboard.calls == [("press", keyboard.Key.esc)]
+    assert replayer._mouse.calls == [("release", mouse.Button.right)]
+
+
+def test_build_dispatcher_without_events():
+    replayer = ActionReplayer()
+    replayer._build_dispatcher([])(_KEY_PRESS, {"key": "a"})
+
+    assert replayer._keyboard.calls == []
+    assert replayer._mouse.calls == []